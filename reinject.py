@@ -42,31 +42,45 @@ manager) exits::
 
 from __future__ import annotations
 
-from collections import deque
-from contextlib import AsyncExitStack, asynccontextmanager
-from contextvars import ContextVar, copy_context
+import asyncio
+from contextlib import AsyncExitStack
+from contextvars import ContextVar, Token
 from typing import (
     Any,
     AsyncContextManager,
-    AsyncIterator,
     Awaitable,
-    Deque,
     Dict,
     Iterable,
+    List,
     Optional,
     Protocol,
+    Sequence,
     Set,
+    Tuple,
 )
 
-_scope_stack: ContextVar[Deque[Scope]] = ContextVar("resource_registry")
+_current_scope: ContextVar[Scope] = ContextVar("reinject_current_scope")
 _registry: Dict[str, Resource] = {}
-_required_resources_by_scope: Dict[str, Set[str]] = {}
+# resource names per scope, as dict keys to keep registration order
+_required_resources_by_scope: Dict[str, Dict[str, None]] = {}
+_autoload_resources_by_scope: Dict[str, Tuple[Resource, ...]] = {}
+_concurrent_setup_resources: Set[str] = set()
+_cache_scope_by_resource: Dict[str, str] = {}
+# cached instances by name, along with the resource they were created by
+_cached_instances: Dict[str, Tuple[Resource, Any]] = {}
+_cache_locks: Dict[str, asyncio.Lock] = {}
+_cache_exitstack = AsyncExitStack()
+_MISSING = object()
 
 APP_SCOPE = "application"
 
 
 def register_resource(
-    resource: Resource, *, autoload_in_scopes: Optional[Iterable[str]] = None
+    resource: Resource,
+    *,
+    autoload_in_scopes: Optional[Iterable[str]] = None,
+    cache_in_scope: Optional[str] = None,
+    concurrent_setup: bool = False,
 ) -> None:
     """Register a resource for later use.
 
@@ -79,16 +93,93 @@ def register_resource(
                                resource will automatically be created,
                                inserted into the scope, and when the scope
                                exits it will be destroyed.
+    :param cache_in_scope: An application defined scope name; when the
+                           resource is added to a scope with this name,
+                           the instance is created only once and reused
+                           every time such a scope is entered again. It
+                           is not destroyed when the scope exits, but by
+                           :func:`shutdown_cache`.
+    :param concurrent_setup: When True, this resource is autoloaded
+                             concurrently with other such resources
+                             autoloaded into the same scope. It may then
+                             be created in a task of its own, while it is
+                             destroyed by the task exiting the scope, so
+                             it must not rely on being set up and torn
+                             down in the same task (e.g. by using
+                             ``asyncio.timeout()`` or setting
+                             ContextVars). Other autoloaded resources are
+                             created one after another, in the task
+                             entering the scope.
     """
     _registry[resource.name] = resource
 
+    if concurrent_setup:
+        _concurrent_setup_resources.add(resource.name)
+    else:
+        _concurrent_setup_resources.discard(resource.name)
+
+    cached = _cached_instances.get(resource.name)
+    if cached is not None and cached[0] is not resource:
+        # the replaced resource's instance is destroyed by shutdown_cache()
+        del _cached_instances[resource.name]
+
+    if cache_in_scope is None:
+        _cache_scope_by_resource.pop(resource.name, None)
+    else:
+        _cache_scope_by_resource[resource.name] = cache_in_scope
+
     if autoload_in_scopes:
         for scope_name in autoload_in_scopes:
-            _required_resources_by_scope.setdefault(scope_name, set()).add(
+            _required_resources_by_scope.setdefault(scope_name, {})[
                 resource.name
+            ] = None
+
+    # resolve autoloaded resources up front, so that entering a scope
+    # doesn't have to go through the registry
+    for scope_name, resource_names in _required_resources_by_scope.items():
+        if resource.name in resource_names:
+            _autoload_resources_by_scope[scope_name] = tuple(
+                _registry[resource_name] for resource_name in resource_names
             )
 
 
+async def shutdown_cache() -> None:
+    """Destroy all resource instances cached using `cache_in_scope`.
+
+    This should be called once the application no longer needs them,
+    e.g. at shutdown. Cached resources will be created anew the next
+    time they are needed.
+    """
+    _cached_instances.clear()
+    _cache_locks.clear()
+    await _cache_exitstack.aclose()
+
+
+async def _get_cached_instance(resource: Resource) -> Any:
+    """Get the cached instance of a resource, creating it if needed.
+
+    Concurrent callers wait for the instance being created, rather
+    than creating one each.
+    """
+    cached = _cached_instances.get(resource.name)
+    if cached is not None and cached[0] is resource:
+        return cached[1]
+
+    lock = _cache_locks.get(resource.name)
+    if lock is None:
+        lock = _cache_locks[resource.name] = asyncio.Lock()
+
+    async with lock:
+        cached = _cached_instances.get(resource.name)
+        if cached is not None and cached[0] is resource:
+            return cached[1]
+
+        value = await _cache_exitstack.enter_async_context(resource.managed())
+        _cached_instances[resource.name] = (resource, value)
+
+    return value
+
+
 def resource_scope(name: str) -> AsyncContextManager[Scope]:
     """Establish a resource scope.
 
@@ -115,9 +206,8 @@ def get_current_scope() -> Scope:
 
     If no resource scope is active, then a RuntimeError is raised."""
     try:
-        scope_stack = _scope_stack.get()
-        return scope_stack[-1]
-    except (LookupError, IndexError):
+        return _current_scope.get()
+    except LookupError:
         raise RuntimeError("No resource scope is currently active.")
 
 
@@ -126,6 +216,11 @@ class ResourceSetupFunction(Protocol):
         """Create a resource instance"""
 
 
+class ResourceBatchSetupFunction(Protocol):
+    def __call__(self, count: int) -> Awaitable[Sequence[Any]]:
+        """Create `count` resource instances"""
+
+
 class ResourceTeardownFunction(Protocol):
     def __call__(self, value: Any) -> Awaitable[None]:
         """Destroy a resource instance"""
@@ -178,6 +273,8 @@ class SetupTeardownResource:
         SetupTeardownResouce("session", create_session, destroy_session)
     """
 
+    __slots__ = ("name", "setup", "teardown", "manager")
+
     def __init__(
         self,
         name: str,
@@ -189,11 +286,241 @@ class SetupTeardownResource:
         self.teardown = teardown
         self.manager = self
 
-    @asynccontextmanager
-    async def managed(self) -> AsyncIterator[Any]:
-        value = await self.setup()
-        yield value
-        await self.teardown(value)
+    def managed(self) -> AsyncContextManager[Any]:
+        return _SetupTeardownContext(self.setup, self.teardown)
+
+
+class _SetupTeardownContext:
+    """Context manager for a single :class:`SetupTeardownResource`
+    instance.
+
+    Cheaper to enter and exit than a generator based
+    ``@asynccontextmanager``.
+    """
+
+    __slots__ = ("setup", "teardown", "value")
+
+    def __init__(
+        self,
+        setup: ResourceSetupFunction,
+        teardown: ResourceTeardownFunction,
+    ) -> None:
+        self.setup = setup
+        self.teardown = teardown
+        self.value: Any = None
+
+    async def __aenter__(self) -> Any:
+        self.value = await self.setup()
+        return self.value
+
+    async def __aexit__(self, *_: Any) -> None:
+        await self.teardown(self.value)
+
+
+class PooledResource:
+    """A :class:`Resource` implementation which reuses instances
+    between scopes.
+
+    Instead of being destroyed when its scope exits, an instance is
+    returned to a pool and handed out to the next scope requiring the
+    resource. This is useful for resources which are expensive to
+    create, but can safely be reused, like database connections::
+
+        PooledResource("connection", connect, disconnect, size=16)
+
+    At most `size` idle instances are kept; surplus instances, as well
+    as those whose scope exited with an exception, are destroyed using
+    the teardown function.
+    """
+
+    __slots__ = ("name", "setup", "teardown", "size", "_idle")
+
+    def __init__(
+        self,
+        name: str,
+        setup: ResourceSetupFunction,
+        teardown: ResourceTeardownFunction,
+        *,
+        size: int = 16,
+    ) -> None:
+        self.name = name
+        self.setup = setup
+        self.teardown = teardown
+        self.size = size
+        self._idle: List[Any] = []
+
+    def managed(self) -> AsyncContextManager[Any]:
+        return _PooledContext(self)
+
+    async def close(self) -> None:
+        """Destroy all idle instances in the pool."""
+        idle, self._idle = self._idle, []
+        for value in idle:
+            await self.teardown(value)
+
+
+class _PooledContext:
+    """Context manager borrowing an instance from a
+    :class:`PooledResource`."""
+
+    __slots__ = ("pool", "value")
+
+    def __init__(self, pool: PooledResource) -> None:
+        self.pool = pool
+        self.value: Any = None
+
+    async def __aenter__(self) -> Any:
+        idle = self.pool._idle
+        self.value = idle.pop() if idle else await self.pool.setup()
+        return self.value
+
+    async def __aexit__(self, exc_type: Any, *_: Any) -> None:
+        idle = self.pool._idle
+        if exc_type is None and len(idle) < self.pool.size:
+            idle.append(self.value)
+        else:
+            await self.pool.teardown(self.value)
+
+
+class BatchedResource:
+    """A :class:`Resource` implementation which creates instances
+    in batches.
+
+    Instances requested by several scopes at about the same time are
+    created together, using a single call to a setup function which
+    receives the number of instances to create. This is useful for
+    resources which are cheaper to create in bulk, like checking out
+    several connections from a pool at once::
+
+        async def acquire_connections(count: int) -> List[Connection]:
+            ...
+
+        BatchedResource("connection", acquire_connections, release)
+
+    A batch is created as soon as `max_batch_size` instances were
+    requested, or `max_wait` seconds after the first request of the
+    batch. The setup function must return exactly as many instances
+    as requested. Each instance is destroyed separately using the
+    teardown function when its scope exits.
+    """
+
+    __slots__ = (
+        "name",
+        "setup_many",
+        "teardown",
+        "max_batch_size",
+        "max_wait",
+        "_loop",
+        "_waiters",
+        "_flush_handle",
+        "_tasks",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        setup_many: ResourceBatchSetupFunction,
+        teardown: ResourceTeardownFunction,
+        *,
+        max_batch_size: int = 16,
+        max_wait: float = 0.001,
+    ) -> None:
+        self.name = name
+        self.setup_many = setup_many
+        self.teardown = teardown
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._waiters: List[asyncio.Future[Any]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task[None]] = set()
+
+    def managed(self) -> AsyncContextManager[Any]:
+        return _BatchedContext(self)
+
+    async def _acquire(self) -> Any:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # a batch pending on a previous event loop will never be
+            # created, so start over on this one
+            self._loop = loop
+            self._waiters = []
+            self._flush_handle = None
+            self._tasks = set()
+
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+
+        if len(self._waiters) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+
+        return await waiter
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        waiters, self._waiters = self._waiters, []
+        task = asyncio.ensure_future(self._setup_batch(waiters))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _setup_batch(self, waiters: List[asyncio.Future[Any]]) -> None:
+        try:
+            values = await self.setup_many(len(waiters))
+        except Exception as exc:
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(exc)
+            return
+        except BaseException:
+            # e.g. cancelled on shutdown; don't leave anyone waiting
+            for waiter in waiters:
+                waiter.cancel()
+            raise
+
+        # settle every waiter before awaiting anything else, so that
+        # a failing teardown can't leave any of them pending
+        unused: List[Any] = []
+        if len(values) != len(waiters):
+            error = RuntimeError(
+                f"Batch setup for resource {repr(self.name)} returned "
+                f"{len(values)} instances, but {len(waiters)} were requested."
+            )
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(error)
+            unused.extend(values)
+        else:
+            for waiter, value in zip(waiters, values):
+                if waiter.done():
+                    # whoever requested this instance was cancelled meanwhile
+                    unused.append(value)
+                else:
+                    waiter.set_result(value)
+
+        for value in unused:
+            await self.teardown(value)
+
+
+class _BatchedContext:
+    """Context manager for a single :class:`BatchedResource` instance."""
+
+    __slots__ = ("resource", "value")
+
+    def __init__(self, resource: BatchedResource) -> None:
+        self.resource = resource
+        self.value: Any = None
+
+    async def __aenter__(self) -> Any:
+        self.value = await self.resource._acquire()
+        return self.value
+
+    async def __aexit__(self, *_: Any) -> None:
+        await self.resource.teardown(self.value)
 
 
 class Scope:
@@ -205,36 +532,33 @@ class Scope:
     for resources using the `in` keyword.
     """
 
+    __slots__ = ("name", "own_resources", "exitstack", "_parent", "_token")
+
     def __init__(self, name: str, parent: Optional[Scope] = None) -> None:
         self.name = name
         self.own_resources: Dict[str, Any] = {}
-        self.parent_resources: Dict[str, Any] = (
-            {}
-            if parent is None
-            else {**parent.own_resources, **parent.parent_resources}
-        )
-        self.exitstack = AsyncExitStack()
+        self._parent = parent
+        self.exitstack: Optional[AsyncExitStack] = None
+        self._token: Optional[Token[Scope]] = None
 
     async def __aenter__(self) -> Scope:
         """Create and track resources required by this scope."""
-        for resource_name in _required_resources_by_scope.get(
-            self.name, set()
-        ):
-            await self.ensure_resource(resource_name)
+        autoloaded = _autoload_resources_by_scope.get(self.name, ())
+        if autoloaded:
+            await self._autoload(autoloaded)
 
-        current_context = copy_context()
-        if _scope_stack not in current_context:
-            _scope_stack.set(deque())
-
-        _scope_stack.get().append(self)
+        self._token = _current_scope.set(self)
 
         return self
 
     async def __aexit__(self, *_: Any) -> None:
         """Untrack and destroy resources created in this scope."""
-        _scope_stack.get().pop()
-        self.own_resources = {}
-        await self.exitstack.aclose()
+        if self._token is not None:
+            _current_scope.reset(self._token)
+            self._token = None
+        self.own_resources.clear()
+        if self.exitstack is not None:
+            await self.exitstack.aclose()
 
     def __getitem__(self, name: str) -> Any:
         """Get a named resource from this scope.
@@ -244,34 +568,135 @@ class Scope:
         :func:`ensure_resource` before this function), then this will
         raise a KeyError.
         """
-        if name in self.own_resources:
-            return self.own_resources[name]
-        elif name in self.parent_resources:
-            return self.parent_resources[name]
-        else:
-            raise KeyError(
-                f"Resource {repr(name)} not instantiated under this scope. "
-                "(Hint: try .ensure_resource() beforehand)"
-            )
+        scope: Optional[Scope] = self
+        while scope is not None:
+            value = scope.own_resources.get(name, _MISSING)
+            if value is not _MISSING:
+                return value
+            scope = scope._parent
+
+        raise KeyError(
+            f"Resource {repr(name)} not instantiated under this scope. "
+            "(Hint: try .ensure_resource() beforehand)"
+        )
 
     def __contains__(self, resource_name: str) -> bool:
-        return (resource_name in self.own_resources) or (
-            resource_name in self.parent_resources
-        )
+        scope: Optional[Scope] = self
+        while scope is not None:
+            if resource_name in scope.own_resources:
+                return True
+            scope = scope._parent
+
+        return False
 
     def __repr__(self) -> str:
         return f"Scope({repr(self.name)})"
 
+    async def _autoload(self, autoloaded: Tuple[Resource, ...]) -> None:
+        """Add autoloaded resources which aren't yet visible in this scope."""
+        concurrent: List[Resource] = []
+        try:
+            for resource in autoloaded:
+                if resource.name in self:
+                    continue
+
+                if resource.name in _concurrent_setup_resources:
+                    concurrent.append(resource)
+                else:
+                    await self.add_resource(resource)
+
+            if len(concurrent) == 1:
+                await self.add_resource(concurrent[0])
+            elif concurrent:
+                await self._add_concurrently(concurrent)
+        except BaseException:
+            # the scope won't be entered, so dispose of the
+            # resources which were created successfully
+            if self.exitstack is not None:
+                await self.exitstack.aclose()
+            raise
+
+    async def _add_concurrently(self, resources: List[Resource]) -> None:
+        """Add resources to this scope, setting them up concurrently."""
+        tasks = [
+            asyncio.ensure_future(self._enter_resource(resource))
+            for resource in resources
+        ]
+        error: Optional[BaseException] = None
+        try:
+            await asyncio.wait(tasks)
+        finally:
+            # if this task was cancelled, wait for the setups which are
+            # still running, so that none of the created resources get lost
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+
+            # only track the resources from this task, in the order
+            # they were registered
+            for resource, task in zip(resources, tasks):
+                if task.cancelled():
+                    continue
+
+                exc = task.exception()
+                if exc is not None:
+                    error = error or exc
+                    continue
+
+                value, manager = task.result()
+                if manager is not None:
+                    self._push_exit(manager)
+                self.own_resources[resource.name] = value
+
+        if error is not None:
+            raise error
+
+    async def _enter_resource(
+        self, resource: Resource
+    ) -> Tuple[Any, Optional[AsyncContextManager[Any]]]:
+        """Create a resource instance for this scope.
+
+        Also returns the context manager which has to be exited to
+        dispose of the instance, unless it is cached.
+        """
+        if self._is_cached(resource):
+            return await _get_cached_instance(resource), None
+
+        manager = resource.managed()
+        return await manager.__aenter__(), manager
+
+    def _is_cached(self, resource: Resource) -> bool:
+        return (
+            _cache_scope_by_resource.get(resource.name) == self.name
+            and _registry.get(resource.name) is resource
+        )
+
+    def _push_exit(self, manager: AsyncContextManager[Any]) -> None:
+        if self.exitstack is None:
+            self.exitstack = AsyncExitStack()
+
+        self.exitstack.push_async_exit(manager)
+
     async def add_resource(self, resource: Resource) -> Any:
         """Add a resource to this scope instance only, without registering it.
 
         This is a 1-time resource that will not be registered, and it will
         be removed as soon as the scope expires.
         """
-        self.own_resources[
-            resource.name
-        ] = await self.exitstack.enter_async_context(resource.managed())
-        return self.own_resources[resource.name]
+        if self._is_cached(resource):
+            value = await _get_cached_instance(resource)
+        else:
+            if self.exitstack is None:
+                self.exitstack = AsyncExitStack()
+
+            value = await self.exitstack.enter_async_context(
+                resource.managed()
+            )
+
+        self.own_resources[resource.name] = value
+        return value
 
     async def ensure_resource(self, name: str) -> Any:
         """Make sure that a previously registered resource is
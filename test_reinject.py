@@ -1,8 +1,9 @@
+import asyncio
+import os
 import random
-import secrets
 from collections import defaultdict
-from contextlib import asynccontextmanager
-from typing import Any, AsyncIterator, Dict, Set
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Set
 
 import pytest
 import pytest_asyncio
@@ -11,10 +12,14 @@ from pytest_mock import MockerFixture
 
 from reinject import (
     APP_SCOPE,
+    BatchedResource,
+    PooledResource,
+    Resource,
     SetupTeardownResource,
     get_current_scope,
     register_resource,
     resource_scope,
+    shutdown_cache,
 )
 
 
@@ -24,6 +29,7 @@ class TrackedResource:
     def __init__(self) -> None:
         self.values: Set[int] = set()
         self.disposal_counts: Dict[int, int] = defaultdict(int)
+        self._unused_values = iter(random.sample(range(102), 102))
 
     @asynccontextmanager
     async def managed(self) -> AsyncIterator[Any]:
@@ -38,11 +44,7 @@ class TrackedResource:
 
     def generate_value(self) -> int:
         """Create a new resource value."""
-        value = random.randint(0, 101)
-
-        while value in self.values:
-            value = random.randint(0, 101)
-
+        value = next(self._unused_values)
         self.values.add(value)
         return value
 
@@ -62,7 +64,7 @@ tokens: Set[str] = set()
 
 
 async def generate_token() -> str:
-    token = secrets.token_hex(32)
+    token = os.urandom(32).hex()
     tokens.add(token)
     return token
 
@@ -82,6 +84,13 @@ async def register_resources(
 ) -> None:
     # first of all, reset the registry for the duration of the test
     mocker.patch("reinject._registry", {})
+    mocker.patch("reinject._required_resources_by_scope", {})
+    mocker.patch("reinject._autoload_resources_by_scope", {})
+    mocker.patch("reinject._concurrent_setup_resources", set())
+    mocker.patch("reinject._cache_scope_by_resource", {})
+    mocker.patch("reinject._cached_instances", {})
+    mocker.patch("reinject._cache_locks", {})
+    mocker.patch("reinject._cache_exitstack", AsyncExitStack())
 
     register_resource(tracked_resource, autoload_in_scopes=["tracked"])
     register_resource(
@@ -116,6 +125,150 @@ async def test_autoloading_resource_into_scopes(
                 assert scope[resource_name] is not None
 
 
+@pytest.mark.asyncio
+async def test_autoloaded_resources_created_in_scope_task_by_default() -> None:
+    setup_tasks: List[Any] = []
+
+    async def setup() -> None:
+        setup_tasks.append(asyncio.current_task())
+
+    async def teardown(value: None) -> None:
+        pass
+
+    for name in ("first", "second"):
+        register_resource(
+            SetupTeardownResource(name, setup, teardown),
+            autoload_in_scopes=["sequential"],
+        )
+
+    async with resource_scope("sequential"):
+        pass
+
+    assert setup_tasks == [asyncio.current_task()] * 2
+
+
+@pytest.mark.asyncio
+async def test_autoloaded_resources_created_concurrently() -> None:
+    setups_started = asyncio.Event()
+    started_names: Set[str] = set()
+
+    def make_setup(name: str) -> Any:
+        async def setup() -> str:
+            started_names.add(name)
+            if len(started_names) == 2:
+                setups_started.set()
+
+            await asyncio.wait_for(setups_started.wait(), timeout=1)
+            return name
+
+        return setup
+
+    async def teardown(value: str) -> None:
+        pass
+
+    for name in ("first", "second"):
+        register_resource(
+            SetupTeardownResource(name, make_setup(name), teardown),
+            autoload_in_scopes=["concurrent"],
+            concurrent_setup=True,
+        )
+
+    async with resource_scope("concurrent") as scope:
+        assert scope["first"] == "first"
+        assert scope["second"] == "second"
+
+
+@pytest.mark.asyncio
+async def test_concurrently_autoloaded_resources_destroyed_by_scope_task() -> None:  # noqa
+    setup_tasks: List[Any] = []
+    teardowns: List[Any] = []
+
+    def make_setup(name: str) -> Any:
+        async def setup() -> str:
+            setup_tasks.append(asyncio.current_task())
+            return name
+
+        return setup
+
+    async def teardown(value: str) -> None:
+        teardowns.append((value, asyncio.current_task()))
+
+    for name in ("first", "second"):
+        register_resource(
+            SetupTeardownResource(name, make_setup(name), teardown),
+            autoload_in_scopes=["concurrent"],
+            concurrent_setup=True,
+        )
+
+    scope_task = asyncio.current_task()
+    async with resource_scope("concurrent"):
+        pass
+
+    # created in tasks of their own, but destroyed by the task
+    # exiting the scope, in reverse order of registration
+    assert len(setup_tasks) == 2
+    assert scope_task not in setup_tasks
+    assert teardowns == [("second", scope_task), ("first", scope_task)]
+
+
+@pytest.mark.asyncio
+async def test_concurrently_autoloaded_resources_destroyed_when_cancelled() -> None:  # noqa
+    slow_setup_started = asyncio.Event()
+
+    async def slow_setup() -> None:
+        slow_setup_started.set()
+        await asyncio.Event().wait()
+
+    async def teardown(value: None) -> None:
+        pass
+
+    register_resource(
+        SetupTeardownResource("token", generate_token, destroy_token),
+        autoload_in_scopes=["cancelled"],
+        concurrent_setup=True,
+    )
+    register_resource(
+        SetupTeardownResource("slow", slow_setup, teardown),
+        autoload_in_scopes=["cancelled"],
+        concurrent_setup=True,
+    )
+
+    async def enter_scope() -> None:
+        async with resource_scope("cancelled"):
+            pass
+
+    entering = asyncio.ensure_future(enter_scope())
+    await slow_setup_started.wait()
+    await asyncio.sleep(0)
+
+    entering.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await entering
+
+    assert not tokens
+
+
+@pytest.mark.asyncio
+async def test_autoloaded_resources_destroyed_when_one_fails() -> None:
+    async def fail() -> str:
+        raise ValueError()
+
+    register_resource(
+        SetupTeardownResource("token", generate_token, destroy_token),
+        autoload_in_scopes=["failing"],
+    )
+    register_resource(
+        SetupTeardownResource("failing", fail, destroy_token),
+        autoload_in_scopes=["failing"],
+    )
+
+    with pytest.raises(ValueError):
+        async with resource_scope("failing"):
+            pass
+
+    assert not tokens
+
+
 @pytest.mark.asyncio
 async def test_loading_resource_from_nested_scopes(
     tracked_resource: TrackedResource,
@@ -131,6 +284,20 @@ async def test_loading_resource_from_nested_scopes(
     tracked_resource.assert_disposed_times(tracked_instance, 1)
 
 
+@pytest.mark.asyncio
+async def test_autoloading_doesnt_recreate_resource_present_in_parent_scope(
+    tracked_resource: TrackedResource,
+) -> None:
+    async with resource_scope("tracked") as outer_scope:
+        tracked_instance = outer_scope["tracked"]
+
+        async with resource_scope("tracked") as inner_scope:
+            assert inner_scope["tracked"] is tracked_instance
+            assert "tracked" not in inner_scope.own_resources
+
+    tracked_resource.assert_disposed_times(tracked_instance, 1)
+
+
 @pytest.mark.asyncio
 async def test_ensure_resource_doesnt_recreate_resource_already_present_in_parent_scope(  # noqa
     resource_name: str,
@@ -150,6 +317,20 @@ async def test_ensure_resource_doesnt_recreate_resource_already_present_in_paren
             assert inner_resource is outer_resource
 
 
+@pytest.mark.asyncio
+async def test_resource_added_to_parent_scope_visible_in_nested_scope(
+    resource_name: str,
+) -> None:
+    async with resource_scope("outer") as outer_scope:
+        async with resource_scope("inner") as inner_scope:
+            assert resource_name not in inner_scope
+
+            outer_resource = await outer_scope.ensure_resource(resource_name)
+
+            assert resource_name in inner_scope
+            assert inner_scope[resource_name] is outer_resource
+
+
 @pytest.mark.asyncio
 async def test_resource_shared_across_coroutines_in_same_scope(
     resource_name: str,
@@ -189,6 +370,273 @@ async def test_extract_unregistered_resource(mocker: MockerFixture) -> None:
     ClientSession_close.assert_called_once()
 
 
+@pytest.mark.asyncio
+async def test_cached_resource_reused_across_scope_entries(
+    tracked_resource: TrackedResource,
+) -> None:
+    register_resource(
+        tracked_resource,
+        autoload_in_scopes=[APP_SCOPE],
+        cache_in_scope=APP_SCOPE,
+    )
+
+    async with resource_scope(APP_SCOPE) as scope:
+        first_instance = scope["tracked"]
+
+    async with resource_scope(APP_SCOPE) as scope:
+        second_instance = scope["tracked"]
+
+    assert first_instance is second_instance
+    tracked_resource.assert_disposed_times(first_instance, 0)
+
+    await shutdown_cache()
+
+    tracked_resource.assert_disposed_times(first_instance, 1)
+
+
+@pytest.mark.asyncio
+async def test_cached_resource_created_once_for_concurrent_scopes() -> None:
+    created_tokens: List[str] = []
+
+    async def generate_slow_token() -> str:
+        await asyncio.sleep(0)
+        created_tokens.append(await generate_token())
+        return created_tokens[-1]
+
+    token_resource = SetupTeardownResource(
+        "token", generate_slow_token, destroy_token
+    )
+    register_resource(token_resource, cache_in_scope=APP_SCOPE)
+
+    first_token, second_token = await asyncio.gather(
+        add_resource_in_scope(token_resource, APP_SCOPE),
+        add_resource_in_scope(token_resource, APP_SCOPE),
+    )
+
+    assert first_token == second_token
+    assert len(created_tokens) == 1
+
+    await shutdown_cache()
+
+
+@pytest.mark.asyncio
+async def test_cached_instance_replaced_when_resource_reregistered(
+    tracked_resource: TrackedResource,
+) -> None:
+    register_resource(tracked_resource, cache_in_scope=APP_SCOPE)
+
+    async with resource_scope(APP_SCOPE) as scope:
+        old_instance = await scope.ensure_resource("tracked")
+
+    new_resource = TrackedResource()
+    register_resource(new_resource, cache_in_scope=APP_SCOPE)
+
+    async with resource_scope(APP_SCOPE) as scope:
+        new_instance = await scope.ensure_resource("tracked")
+
+    assert new_instance is not old_instance
+    assert new_resource.values == set(new_instance)
+
+    await shutdown_cache()
+
+    tracked_resource.assert_disposed_times(old_instance, 1)
+    new_resource.assert_disposed_times(new_instance, 1)
+
+
+@pytest.mark.asyncio
+async def test_unregistered_resource_not_taken_from_cache(
+    tracked_resource: TrackedResource,
+) -> None:
+    register_resource(tracked_resource, cache_in_scope=APP_SCOPE)
+    one_off_resource = TrackedResource()
+
+    async with resource_scope(APP_SCOPE) as scope:
+        cached_instance = await scope.ensure_resource("tracked")
+
+    async with resource_scope(APP_SCOPE) as scope:
+        one_off_instance = await scope.add_resource(one_off_resource)
+
+        assert one_off_instance is not cached_instance
+
+    one_off_resource.assert_disposed_times(one_off_instance, 1)
+
+    await shutdown_cache()
+
+
+@pytest.mark.asyncio
+async def test_pooled_resource_reused_across_scopes() -> None:
+    pool = PooledResource("pooled", generate_token, destroy_token, size=1)
+
+    async with resource_scope("outer") as outer_scope:
+        first_token = await outer_scope.add_resource(pool)
+
+        async with resource_scope("inner") as inner_scope:
+            second_token = await inner_scope.add_resource(pool)
+
+    async with resource_scope("outer") as outer_scope:
+        assert await outer_scope.add_resource(pool) == second_token
+
+    # only one idle instance is kept; the surplus one was destroyed
+    assert first_token not in tokens
+    assert second_token in tokens
+
+    await pool.close()
+
+    assert second_token not in tokens
+
+
+@pytest.mark.asyncio
+async def test_batched_resource_created_in_batches() -> None:
+    batch_sizes: List[int] = []
+
+    async def generate_tokens(count: int) -> List[str]:
+        batch_sizes.append(count)
+        return [await generate_token() for _ in range(count)]
+
+    batched = BatchedResource(
+        "batched", generate_tokens, destroy_token, max_batch_size=3
+    )
+
+    batch_tokens = await asyncio.gather(
+        *(add_resource_in_scope(batched) for _ in range(4))
+    )
+
+    assert batch_sizes == [3, 1]
+    assert len(set(batch_tokens)) == 4
+    assert not tokens.intersection(batch_tokens)
+
+
+@pytest.mark.asyncio
+async def test_batched_resource_setup_failure_propagates_to_all_scopes() -> None:  # noqa
+    async def generate_tokens(count: int) -> List[str]:
+        raise ValueError()
+
+    batched = BatchedResource(
+        "batched", generate_tokens, destroy_token, max_batch_size=2
+    )
+
+    results = await asyncio.wait_for(
+        asyncio.gather(
+            add_resource_in_scope(batched),
+            add_resource_in_scope(batched),
+            return_exceptions=True,
+        ),
+        timeout=1,
+    )
+
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_batched_resource_short_batch_fails_all_scopes() -> None:
+    created_tokens: List[str] = []
+
+    async def generate_tokens(count: int) -> List[str]:
+        created_tokens.append(await generate_token())
+        return created_tokens
+
+    batched = BatchedResource(
+        "batched", generate_tokens, destroy_token, max_batch_size=2
+    )
+
+    results = await asyncio.wait_for(
+        asyncio.gather(
+            add_resource_in_scope(batched),
+            add_resource_in_scope(batched),
+            return_exceptions=True,
+        ),
+        timeout=1,
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert not tokens.intersection(created_tokens)
+
+
+@pytest.mark.asyncio
+async def test_batched_resource_destroys_instance_of_cancelled_scope() -> None:
+    setup_released = asyncio.Event()
+    created_tokens: List[str] = []
+
+    async def generate_tokens(count: int) -> List[str]:
+        await setup_released.wait()
+        created_tokens.extend([await generate_token() for _ in range(count)])
+        return created_tokens
+
+    batched = BatchedResource(
+        "batched", generate_tokens, destroy_token, max_batch_size=2
+    )
+
+    cancelled = asyncio.ensure_future(add_resource_in_scope(batched))
+    remaining = asyncio.ensure_future(add_resource_in_scope(batched))
+    await asyncio.sleep(0)
+
+    cancelled.cancel()
+    setup_released.set()
+
+    assert await asyncio.wait_for(remaining, timeout=1) in created_tokens
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+
+    assert len(created_tokens) == 2
+    assert not tokens.intersection(created_tokens)
+
+
+def test_batched_resource_usable_after_event_loop_change() -> None:
+    async def generate_tokens(count: int) -> List[str]:
+        return [await generate_token() for _ in range(count)]
+
+    batched = BatchedResource(
+        "batched", generate_tokens, destroy_token, max_batch_size=3
+    )
+
+    async def abandon_request() -> None:
+        # left pending, and cancelled when the event loop shuts down
+        asyncio.ensure_future(add_resource_in_scope(batched))
+        await asyncio.sleep(0)
+
+    asyncio.run(abandon_request())
+
+    assert asyncio.run(
+        asyncio.wait_for(add_resource_in_scope(batched), timeout=1)
+    )
+
+
+@pytest.mark.asyncio
+async def test_resource_destroyed_when_scope_exits_with_error() -> None:
+    with pytest.raises(ValueError):
+        async with resource_scope("token") as scope:
+            token = scope["token"]
+            assert token in tokens
+            raise ValueError()
+
+    assert token not in tokens
+
+
+@pytest.mark.asyncio
+async def test_scope_not_visible_to_sibling_coroutines() -> None:
+    inner_entered = asyncio.Event()
+    sibling_checked = asyncio.Event()
+
+    async def enter_inner_scope() -> None:
+        async with resource_scope("inner"):
+            inner_entered.set()
+            await sibling_checked.wait()
+
+    async def check_current_scope() -> Any:
+        await inner_entered.wait()
+        scope = get_current_scope()
+        sibling_checked.set()
+        return scope
+
+    async with resource_scope("outer") as outer_scope:
+        _, sibling_scope = await asyncio.gather(
+            enter_inner_scope(), check_current_scope()
+        )
+
+        assert sibling_scope is outer_scope
+        assert get_current_scope() is outer_scope
+
+
 async def extract_resource_from_current_scope(
     name: str, *, ensure: bool = False, nested_levels: int = 1
 ) -> Any:
@@ -200,22 +648,35 @@ async def extract_resource_from_current_scope(
                    to extract the named resource from it.
 
     :param nested_levels: simulate a coroutine call n levels deep.
-                          This is useful testing whether the
-                          resource extraction works as expected
-                          in coroutines which are nested a certain
-                          number of levels beyond where the scope
-                          is established.
+                          Rather than recursing, this yields to the
+                          event loop n - 1 times before extracting
+                          the resource, which is useful for testing
+                          whether the resource extraction works as
+                          expected after the scope was established
+                          and control passed through the event loop.
     """
     if nested_levels <= 0:
         raise ValueError("coro_levels must be a positive integer.")
-    elif nested_levels > 1:
-        return await extract_resource_from_current_scope(
-            name, ensure=ensure, nested_levels=nested_levels - 1
-        )
-    else:
-        scope = get_current_scope()
 
-        if ensure:
-            await scope.ensure_resource(name)
+    for _ in range(nested_levels - 1):
+        await asyncio.sleep(0)
+
+    scope = get_current_scope()
+
+    if ensure:
+        await scope.ensure_resource(name)
+
+    return scope[name]
 
-        return scope[name]
+
+async def add_resource_in_scope(
+    resource: Resource, scope_name: str = "request"
+) -> Any:
+    """
+    Simulate adding a resource to a newly established scope.
+
+    :param scope_name: name of the scope which is established
+                       to add the resource to.
+    """
+    async with resource_scope(scope_name) as scope:
+        return await scope.add_resource(resource)